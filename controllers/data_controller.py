@@ -1,20 +1,29 @@
 import requests
 from tkinter import messagebox, filedialog
 from utils.file_utils import save_data_to_file, create_folder_if_not_exists, copy_from_copyfolder
+from utils.plan_utils import plan_batches, format_plan, record_job_throughput, measure_caseid_bytes
 from models.api_model import API_URL, API_COUNT_URL
 from models.token_model import TokenStorage
 import threading
 import customtkinter as ctk
 from concurrent.futures import ThreadPoolExecutor
 import os
+import sys
 import time
 from views.extract_view import ExtractView  # Import the ExtractView class
 
 # Global variable to track the number of batches
 num_batches = 0
 
-def get_total_records(caseid_pattern):
-    """Fetch the total number of records available from the custom API."""
+def show_error(title, message, headless=False):
+    """Show an error in a message box, or print it to stderr when running without the UI."""
+    if headless:
+        print(f"{title}: {message}", file=sys.stderr)
+    else:
+        messagebox.showerror(title, message)
+
+def get_total_records(caseid_pattern, headless=False):
+    """Fetch the total number of records available from the custom API. Returns None if the request fails."""
     token = TokenStorage.get_token()
     url = f"{API_COUNT_URL}?caseidPattern={caseid_pattern}"
 
@@ -31,10 +40,10 @@ def get_total_records(caseid_pattern):
         total_records = data.get('count', 0)
         return total_records if isinstance(total_records, int) else total_records.get('count', 0)
     except requests.RequestException as e:
-        messagebox.showerror("API Error", f"Failed to fetch total records: {e}")
-        return 0
+        show_error("API Error", f"Failed to fetch total records: {e}", headless)
+        return None
 
-def fetch_all_data(caseid_pattern, max_limit):
+def fetch_all_data(caseid_pattern, max_limit, headless=False):
     """Fetch all data from the API based on the caseid_pattern."""
     token = TokenStorage.get_token()
     url = f"{API_URL}?caseidPattern={caseid_pattern}&limit={max_limit}"
@@ -53,32 +62,55 @@ def fetch_all_data(caseid_pattern, max_limit):
 
         return caseids
     except requests.RequestException as e:
-        messagebox.showerror("API Error", f"Failed to fetch data: {e}")
+        show_error("API Error", f"Failed to fetch data: {e}", headless)
         return None
 
+def plan_job(parent_folder_path, caseid_pattern, records_per_batch, total_records=None, headless=False):
+    """Plan a batch job before anything is written: batches, disk space, file count and estimated time."""
+    if total_records is None:
+        total_records = get_total_records(caseid_pattern, headless)
+        if total_records is None:
+            return None
+
+    return plan_batches(parent_folder_path, caseid_pattern, records_per_batch, total_records)
+
 def process_batches(parent_folder_path, caseid_pattern, records_per_batch, progress_label, progress_bar, progress_window, on_complete_callback):
-    """Process batches based on the number of records per batch and total records in the API."""
+    """Process batches based on the number of records per batch and total records in the API. Returns True on success."""
     global num_batches
+    headless = progress_window is None
 
     # Create the main batch directory if it doesn't exist
     main_batch_folder = create_folder_if_not_exists(parent_folder_path, caseid_pattern)
 
-    total_records = get_total_records(caseid_pattern)
-    
+    total_records = get_total_records(caseid_pattern, headless)
+
+    if total_records is None:
+        return False
     if total_records == 0:
-        messagebox.showerror("No Data", "No records found for the given CaseID pattern.")
-        return
+        show_error("No Data", "No records found for the given CaseID pattern.", headless)
+        return False
 
-    all_caseids = fetch_all_data(caseid_pattern, total_records)
+    fetch_start = time.perf_counter()
+    all_caseids = fetch_all_data(caseid_pattern, total_records, headless)
+    fetch_seconds = time.perf_counter() - fetch_start
 
+    if all_caseids is None:
+        return False
     if not all_caseids:
-        messagebox.showerror("No Data", "No records found for the given CaseID pattern.")
-        return
+        show_error("No Data", "No records found for the given CaseID pattern.", headless)
+        return False
 
     total_records = len(all_caseids)
     num_batches = (total_records + records_per_batch - 1) // records_per_batch
 
+    write_start = time.perf_counter()
     fetch_batches(all_caseids, main_batch_folder, caseid_pattern, records_per_batch, progress_label, progress_bar, progress_window, on_complete_callback)
+    write_seconds = time.perf_counter() - write_start
+
+    # Record how fast this job ran so the next plan can estimate its duration and size
+    caseid_bytes = measure_caseid_bytes(main_batch_folder, caseid_pattern)
+    record_job_throughput(caseid_pattern, total_records, num_batches, caseid_bytes, fetch_seconds, write_seconds)
+    return True
 
 def fetch_batches(all_caseids, main_batch_folder, caseid_pattern, records_per_batch, progress_label, progress_bar, progress_window, on_complete_callback):
     """Handle the fetching of batches and show progress."""
@@ -93,6 +125,10 @@ def fetch_batches(all_caseids, main_batch_folder, caseid_pattern, records_per_ba
         save_data_to_file(batch_folder_path, caseid_pattern, batch_no, batch_caseids)
         copy_from_copyfolder(batch_folder_path, caseid_pattern, batch_no)
 
+        if progress_window is None:
+            print(f"Completed Batch {batch_no}/{num_batches}")
+            return
+
         progress_label.configure(text=f"Completed Batch {batch_no}/{num_batches}")
         progress_bar.set(batch_no / num_batches)
         progress_window.update()  # Use the passed progress_window
@@ -117,6 +153,10 @@ def open_extract_view(num_batches, parent_folder_path, caseid_pattern):
 
 def handle_submit(caseid_pattern, records_per_batch):
     """Handle the submit logic from the main view."""
+    if records_per_batch < 1:
+        messagebox.showwarning("Invalid Input", "Number of records per batch must be at least 1.")
+        return
+
     folder_path = filedialog.askdirectory(title="Select Parent Directory")
 
     if not folder_path:
@@ -125,15 +165,18 @@ def handle_submit(caseid_pattern, records_per_batch):
 
     total_records = get_total_records(caseid_pattern)
 
+    if total_records is None:
+        return
     if total_records == 0:
         messagebox.showerror("No Data", "No records found for the given CaseID pattern.")
         return
 
     global num_batches
-    num_batches = (total_records + records_per_batch - 1) // records_per_batch
+    plan = plan_job(folder_path, caseid_pattern, records_per_batch, total_records)
+    num_batches = plan['num_batches']
 
-    confirm_message = f"This operation will generate {num_batches} batches, each with up to {records_per_batch} records.\n\nDo you want to proceed?"
-    confirm = messagebox.askyesno("Confirm Batch Generation", confirm_message)
+    confirm_message = f"{format_plan(plan)}\n\nDo you want to proceed?"
+    confirm = messagebox.askyesno("Confirm Batch Generation", confirm_message, icon="question" if plan['fits_on_disk'] else "warning")
 
     if not confirm:
         return
@@ -161,6 +204,28 @@ def handle_submit(caseid_pattern, records_per_batch):
 
     threading.Thread(target=process_batches, args=(folder_path, caseid_pattern, records_per_batch, progress_label, progress_bar, progress_window, on_batches_complete)).start()
 
+def run_headless(folder_path, caseid_pattern, records_per_batch, dry_run=False):
+    """Plan and run a batch job without the UI. With dry_run, only print the plan. Returns True on success."""
+    total_records = get_total_records(caseid_pattern, headless=True)
+
+    if total_records is None:
+        return False
+    if total_records == 0:
+        show_error("No Data", "No records found for the given CaseID pattern.", headless=True)
+        return False
+
+    plan = plan_job(folder_path, caseid_pattern, records_per_batch, total_records, headless=True)
+    print(format_plan(plan))
+
+    if dry_run:
+        return True
+
+    if not plan['fits_on_disk']:
+        show_error("Not Enough Space", f"The job needs more space than is free at {folder_path}.", headless=True)
+        return False
+
+    return process_batches(folder_path, caseid_pattern, records_per_batch, None, None, None, lambda: print("All batches completed!"))
+
 # Main execution code or the main Tkinter app code
 if __name__ == "__main__":
     root = ctk.CTk()  # Create the main window
@@ -1,5 +1,11 @@
+import argparse
+import getpass
+import os
+import sys
 import tkinter as tk
 from controllers.login_controller import LoginController
+from controllers.data_controller import run_headless as run_batches_headless
+from models.api_model import login
 from views.login_view import LoginView
 import threading
 
@@ -23,7 +29,49 @@ class Application(tk.Tk):
         else:
             self.destroy()  # Destroy the main window
 
+def run_headless(args):
+    """Log in and plan or run a batch job from the command line, without opening any window. Returns True on success."""
+    username = args.username or os.getenv('APP_USERNAME')
+    if not username:
+        print("Login Error: Provide --username or set APP_USERNAME.", file=sys.stderr)
+        return False
+
+    # The password is never taken from the command line, where it would end up in shell history
+    password = os.getenv('APP_PASSWORD') or getpass.getpass("Password: ")
+    if not password:
+        print("Login Error: No password given.", file=sys.stderr)
+        return False
+
+    try:
+        login(username, password)
+    except RuntimeError as e:
+        print(f"Login Error: {e}", file=sys.stderr)
+        return False
+
+    return run_batches_headless(args.folder, args.caseid, args.records, dry_run=args.dry_run)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate CaseID batches.")
+    parser.add_argument("--headless", action="store_true", help="Run without the UI")
+    parser.add_argument("--caseid", help="CaseID pattern to fetch")
+    parser.add_argument("--records", type=int, default=1000, help="Number of records per batch (default: 1000)")
+    parser.add_argument("--folder", help="Parent directory for the batch folders")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan, do not write anything")
+    parser.add_argument("--username", help="API username (default: APP_USERNAME)")
+    args = parser.parse_args()
+
+    if args.headless and (not args.caseid or not args.folder):
+        parser.error("--headless requires --caseid and --folder")
+    if args.records < 1:
+        parser.error("--records must be at least 1")
+
+    return args
+
 def main():
+    args = parse_args()
+    if args.headless:
+        sys.exit(0 if run_headless(args) else 1)
+
     app = Application()
     app.protocol("WM_DELETE_WINDOW", app.on_closing)  # Bind the close event
     app.mainloop()  # Start the Tkinter event loop
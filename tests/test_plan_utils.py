@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from utils import plan_utils
+
+
+@pytest.fixture(autouse=True)
+def history_file(tmp_path, monkeypatch):
+    """Point the job history at a temporary file so tests never touch the real one."""
+    path = tmp_path / "history" / "job_history.json"
+    monkeypatch.setattr(plan_utils, "HISTORY_FILE", str(path))
+    return path
+
+
+@pytest.fixture
+def fixed_block_size(monkeypatch):
+    monkeypatch.setattr(plan_utils, "get_block_size", lambda folder_path: (4096, True))
+
+
+def test_allocated_size_rounds_up_to_whole_blocks():
+    assert plan_utils._allocated_size(0) == 0
+    assert plan_utils._allocated_size(1) == 4096
+    assert plan_utils._allocated_size(4096) == 4096
+    assert plan_utils._allocated_size(4097) == 8192
+    assert plan_utils._allocated_size(513, block_size=512) == 1024
+
+
+def test_free_space_uses_nearest_existing_parent(tmp_path):
+    missing = tmp_path / "not" / "created" / "yet"
+    assert plan_utils.get_free_space(str(missing)) == plan_utils.get_free_space(str(tmp_path))
+    assert plan_utils.get_free_space(str(missing)) is not None
+
+
+def test_throughput_rates_default_without_history():
+    assert plan_utils.get_throughput_rates("X") == (
+        plan_utils.DEFAULT_BYTES_PER_CASEID,
+        plan_utils.DEFAULT_FETCH_SECONDS_PER_RECORD,
+        plan_utils.DEFAULT_WRITE_SECONDS_PER_BATCH,
+    )
+
+
+def test_throughput_rates_prefer_matching_pattern(history_file):
+    plan_utils.record_job_throughput("X", 100, 10, 700, 1.0, 5.0)
+    plan_utils.record_job_throughput("Y", 100, 4, 2000, 10.0, 8.0)
+
+    assert history_file.exists()
+    assert plan_utils.get_throughput_rates("X") == (7.0, 0.01, 0.5)
+    assert plan_utils.get_throughput_rates("Y") == (20.0, 0.1, 2.0)
+    # Unknown patterns fall back to every recorded job
+    assert plan_utils.get_throughput_rates("Z") == (2700 / 200, 11.0 / 200, 13.0 / 14)
+
+
+def test_history_keeps_only_recent_entries(monkeypatch):
+    monkeypatch.setattr(plan_utils, "MAX_HISTORY_ENTRIES", 3)
+    for records in range(1, 6):
+        plan_utils.record_job_throughput("X", records, 1, records, 0.0, 0.0)
+
+    assert [entry["records"] for entry in plan_utils.load_job_history()] == [3, 4, 5]
+
+
+def test_corrupt_history_is_ignored(history_file):
+    history_file.parent.mkdir(parents=True)
+    history_file.write_text("{not json")
+    assert plan_utils.load_job_history() == []
+
+
+def test_plan_batches_counts(tmp_path, fixed_block_size):
+    template_bytes, template_allocated, template_files, template_folders = plan_utils.get_copyfolder_footprint()
+    plan = plan_utils.plan_batches(str(tmp_path), "X", 1000, 2500)
+
+    assert plan["num_batches"] == 3
+    assert plan["target_folder"] == os.path.join(str(tmp_path), "X")
+    assert plan["inode_count"] == 1 + 3 * (3 + template_files + template_folders)
+    assert plan["total_bytes"] > 2500 * plan_utils.DEFAULT_BYTES_PER_CASEID + 3 * template_bytes
+    assert plan["allocated_bytes"] >= plan["total_bytes"]
+    assert not plan["allocated_is_upper_bound"]
+    assert plan["fits_on_disk"]
+
+
+def test_plan_batches_with_no_records(tmp_path):
+    plan = plan_utils.plan_batches(str(tmp_path), "X", 1000, 0)
+
+    assert plan["num_batches"] == 0
+    assert plan["inode_count"] == 0
+    assert plan["total_bytes"] == 0
+    assert plan["estimated_seconds"] == 0
+
+
+def test_plan_batches_rejects_empty_batches(tmp_path):
+    with pytest.raises(ValueError):
+        plan_utils.plan_batches(str(tmp_path), "X", 0, 100)
+
+
+def test_plan_batches_uses_suffixed_folder_on_rerun(tmp_path):
+    (tmp_path / "X").mkdir()
+    plan = plan_utils.plan_batches(str(tmp_path), "X", 1000, 100)
+    assert plan["target_folder"] == os.path.join(str(tmp_path), "X (1)")
+
+
+def test_plan_batches_flags_missing_space(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_utils, "get_free_space", lambda folder_path: 1)
+    plan = plan_utils.plan_batches(str(tmp_path), "X", 1000, 100)
+
+    assert not plan["fits_on_disk"]
+    assert "WARNING" in plan_utils.format_plan(plan)
+
+
+def test_estimated_time_is_sum_of_rounded_parts(tmp_path):
+    plan = plan_utils.plan_batches(str(tmp_path), "X", 1000, 12345)
+
+    assert (plan["fetch_seconds"], plan["write_seconds"], plan["estimated_seconds"]) == (13, 7, 20)
+    assert "Estimated time: 20s (fetch 13s, write 7s)" in plan_utils.format_plan(plan)
+
+
+def test_format_plan_marks_unknowns(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_utils, "get_free_space", lambda folder_path: None)
+    monkeypatch.setattr(plan_utils, "get_block_size", lambda folder_path: (4096, False))
+    text = plan_utils.format_plan(plan_utils.plan_batches(str(tmp_path), "X", 1000, 100))
+
+    assert "Free space at target: unknown" in text
+    assert "Disk space needed (at most):" in text
+
+
+@pytest.mark.parametrize("num_bytes, expected", [
+    (0, "0 B"),
+    (1023, "1023 B"),
+    (1024, "1.0 KB"),
+    (1536, "1.5 KB"),
+    (5 * 1024 ** 3, "5.0 GB"),
+    (2 * 1024 ** 4, "2.0 TB"),
+])
+def test_format_bytes(num_bytes, expected):
+    assert plan_utils._format_bytes(num_bytes) == expected
+
+
+@pytest.mark.parametrize("seconds, expected", [
+    (0, "0s"),
+    (59, "59s"),
+    (60, "1m 0s"),
+    (3661, "1h 1m 1s"),
+])
+def test_format_duration(seconds, expected):
+    assert plan_utils._format_duration(seconds) == expected
@@ -1,19 +1,25 @@
 import shutil
 import os
 
-def create_folder_if_not_exists(parent_folder, folder_name):
-    """Create a folder if it doesn't exist, and append (new) if a folder with the same name already exists."""
-    # Ensure the parent folder exists
-    os.makedirs(parent_folder, exist_ok=True)
-    
+def get_unique_folder_path(parent_folder, folder_name):
+    """Return the path create_folder_if_not_exists would use, without creating anything."""
     batch_folder_path = os.path.join(parent_folder, folder_name)
-    
+
     # Use a count to create unique folder names if necessary
     count = 1
     while os.path.exists(batch_folder_path):
         batch_folder_path = os.path.join(parent_folder, f"{folder_name} ({count})")
         count += 1
 
+    return batch_folder_path
+
+def create_folder_if_not_exists(parent_folder, folder_name):
+    """Create a folder if it doesn't exist, and append (new) if a folder with the same name already exists."""
+    # Ensure the parent folder exists
+    os.makedirs(parent_folder, exist_ok=True)
+    
+    batch_folder_path = get_unique_folder_path(parent_folder, folder_name)
+
     os.makedirs(batch_folder_path, exist_ok=True)  # Create the final batch folder
     return batch_folder_path
 
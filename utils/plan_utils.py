@@ -0,0 +1,279 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from utils.file_utils import get_unique_folder_path
+
+APP_NAME = "PythonScriptwithAPI"
+
+
+def get_user_data_dir():
+    """Return the per-user folder for app data, which survives reinstalls and one-file builds."""
+    if os.name == "nt":
+        base = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, APP_NAME)
+
+
+# Where completed jobs record how fast they ran, used to estimate future jobs
+HISTORY_FILE = os.path.join(get_user_data_dir(), 'job_history.json')
+MAX_HISTORY_ENTRIES = 50
+
+# Batch jobs finish on worker threads, so only one may update the history at a time
+_history_lock = threading.Lock()
+
+# Fallbacks used until a job has been recorded in the history file
+DEFAULT_BYTES_PER_CASEID = 33  # Typical CaseID length plus the newline written after it
+DEFAULT_FETCH_SECONDS_PER_RECORD = 0.001
+DEFAULT_WRITE_SECONDS_PER_BATCH = 0.5  # fetch_batches waits 0.5s between batch submissions
+
+# Small files still take up a whole block on disk. Used when the drive's real block size
+# can't be read (e.g. on Windows, where NTFS keeps small files in the file table), which
+# makes the disk space figure an upper bound.
+DISK_BLOCK_SIZE = 4096
+
+
+def _allocated_size(num_bytes, block_size=DISK_BLOCK_SIZE):
+    """Round a file size up to the number of bytes it occupies on disk."""
+    if num_bytes <= 0:
+        return 0
+    return ((num_bytes + block_size - 1) // block_size) * block_size
+
+
+def _nearest_existing_path(folder_path):
+    """Return folder_path or its nearest existing parent, or None if none of them exist."""
+    # The target folder may not exist yet; create_folder_if_not_exists makes it later
+    path = os.path.abspath(folder_path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    return path
+
+
+def get_free_space(folder_path):
+    """Return the free bytes on the drive that folder_path is or will be created on, or None if unknown."""
+    path = _nearest_existing_path(folder_path)
+    if path is None:
+        return None
+
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def get_block_size(folder_path):
+    """Return (block size, exact) for the drive folder_path is on. exact is False when DISK_BLOCK_SIZE is assumed."""
+    path = _nearest_existing_path(folder_path)
+    if path is None or not hasattr(os, "statvfs"):
+        return DISK_BLOCK_SIZE, False
+
+    try:
+        block_size = os.statvfs(path).f_frsize
+    except OSError:
+        return DISK_BLOCK_SIZE, False
+
+    return (block_size, True) if block_size > 0 else (DISK_BLOCK_SIZE, False)
+
+
+def get_copyfolder_footprint(block_size=DISK_BLOCK_SIZE):
+    """Return (bytes, allocated bytes, files, folders) of what copy_from_copyfolder copies into every batch."""
+    copy_folder = os.path.join(os.path.dirname(__file__), '..', 'CopyFolder')
+    total_bytes = 0
+    allocated_bytes = 0
+    file_count = 0
+    folder_count = 0
+
+    if not os.path.exists(copy_folder):
+        return total_bytes, allocated_bytes, file_count, folder_count
+
+    for root, dirs, files in os.walk(copy_folder):
+        folder_count += len(dirs)
+        for name in files:
+            size = os.path.getsize(os.path.join(root, name))
+            total_bytes += size
+            allocated_bytes += _allocated_size(size, block_size)
+            file_count += 1
+
+    return total_bytes, allocated_bytes, file_count, folder_count
+
+
+def measure_caseid_bytes(main_batch_folder, caseid_pattern):
+    """Return the size on disk of the CaseID lists save_data_to_file wrote under main_batch_folder."""
+    total_bytes = 0
+    for root, dirs, files in os.walk(main_batch_folder):
+        for name in files:
+            if name.startswith(f"{caseid_pattern}_Batch_") and name.endswith(".txt"):
+                total_bytes += os.path.getsize(os.path.join(root, name))
+    return total_bytes
+
+
+def load_job_history():
+    """Load the recorded job throughput history, or an empty list if there is none."""
+    try:
+        with open(HISTORY_FILE, "r") as file:
+            history = json.load(file)
+        return history if isinstance(history, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def record_job_throughput(caseid_pattern, total_records, num_batches, caseid_bytes, fetch_seconds, write_seconds):
+    """Append the measurements of a finished job to the history file."""
+    with _history_lock:
+        history = load_job_history()
+        history.append({
+            "caseid_pattern": caseid_pattern,
+            "records": total_records,
+            "batches": num_batches,
+            "caseid_bytes": caseid_bytes,
+            "fetch_seconds": fetch_seconds,
+            "write_seconds": write_seconds,
+            "finished_at": time.time(),
+        })
+
+        history_folder = os.path.dirname(HISTORY_FILE)
+        try:
+            os.makedirs(history_folder, exist_ok=True)
+            # Write a temporary file and swap it in, so a reader never sees a half-written history
+            fd, temp_path = tempfile.mkstemp(dir=history_folder, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as file:
+                    json.dump(history[-MAX_HISTORY_ENTRIES:], file, indent=2)
+                os.replace(temp_path, HISTORY_FILE)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            print(f"Error saving job history: {e}")
+
+
+def get_throughput_rates(caseid_pattern):
+    """Return (bytes per CaseID, fetch seconds per record, write seconds per batch) from the job history.
+
+    Jobs for the same CaseID pattern are preferred; otherwise every recorded job is used,
+    and the defaults are used when nothing has been recorded yet.
+    """
+    history = load_job_history()
+    matching = [entry for entry in history if entry.get("caseid_pattern") == caseid_pattern]
+    entries = matching or history
+
+    records = sum(entry.get("records", 0) for entry in entries)
+    batches = sum(entry.get("batches", 0) for entry in entries)
+
+    if not records or not batches:
+        return DEFAULT_BYTES_PER_CASEID, DEFAULT_FETCH_SECONDS_PER_RECORD, DEFAULT_WRITE_SECONDS_PER_BATCH
+
+    bytes_per_caseid = sum(entry.get("caseid_bytes", 0) for entry in entries) / records
+    fetch_seconds_per_record = sum(entry.get("fetch_seconds", 0) for entry in entries) / records
+    write_seconds_per_batch = sum(entry.get("write_seconds", 0) for entry in entries) / batches
+
+    return bytes_per_caseid, fetch_seconds_per_record, write_seconds_per_batch
+
+
+def plan_batches(parent_folder_path, caseid_pattern, records_per_batch, total_records):
+    """Estimate what a batch job will write and how long it will take, without writing anything."""
+    if records_per_batch < 1:
+        raise ValueError("Number of records per batch must be at least 1.")
+
+    num_batches = (total_records + records_per_batch - 1) // records_per_batch if total_records > 0 else 0
+    bytes_per_caseid, fetch_seconds_per_record, write_seconds_per_batch = get_throughput_rates(caseid_pattern)
+    block_size, block_size_exact = get_block_size(parent_folder_path)
+    template_bytes, template_allocated, template_files, template_folders = get_copyfolder_footprint(block_size)
+
+    # A rerun of the same pattern gets a " (n)" suffix, which lengthens every path written into the batches
+    main_batch_folder = os.path.abspath(get_unique_folder_path(parent_folder_path, caseid_pattern))
+
+    total_bytes = 0
+    allocated_bytes = 0
+    for batch_no in range(1, num_batches + 1):
+        records_in_batch = min(records_per_batch, total_records - (batch_no - 1) * records_per_batch)
+        subfolder_name = f"{caseid_pattern}_Batch_{batch_no}"
+        txt_file_path = os.path.join(main_batch_folder, subfolder_name, f"{subfolder_name}.txt")
+
+        caseid_bytes = int(records_in_batch * bytes_per_caseid)
+        # batch_path.txt holds the full path of the text file, and so does INPUT_FILE in extractData.pff
+        path_bytes = len(txt_file_path)
+
+        total_bytes += caseid_bytes + path_bytes + template_bytes + path_bytes
+        # The batch folder itself takes a block as well
+        allocated_bytes += (block_size + _allocated_size(caseid_bytes, block_size)
+                            + _allocated_size(path_bytes, block_size) + template_allocated)
+
+    # Main folder, then per batch: its folder, the CaseID list, batch_path.txt and the CopyFolder contents
+    inode_count = 1 + num_batches * (1 + 2 + template_files + template_folders) if num_batches else 0
+
+    # Whole seconds, rounded up, so the total always matches its parts
+    fetch_seconds = math.ceil(total_records * fetch_seconds_per_record)
+    write_seconds = math.ceil(num_batches * write_seconds_per_batch)
+
+    free_bytes = get_free_space(parent_folder_path)
+
+    return {
+        "caseid_pattern": caseid_pattern,
+        "target_folder": main_batch_folder,
+        "total_records": total_records,
+        "records_per_batch": records_per_batch,
+        "num_batches": num_batches,
+        "total_bytes": total_bytes,
+        "allocated_bytes": allocated_bytes,
+        "allocated_is_upper_bound": not block_size_exact,
+        "inode_count": inode_count,
+        "fetch_seconds": fetch_seconds,
+        "write_seconds": write_seconds,
+        "estimated_seconds": fetch_seconds + write_seconds,
+        "free_bytes": free_bytes,
+        "fits_on_disk": free_bytes is None or allocated_bytes <= free_bytes,
+    }
+
+
+def _format_bytes(num_bytes):
+    """Format a byte count for display."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _format_duration(seconds):
+    """Format a whole number of seconds for display."""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes}m {seconds}s"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+def format_plan(plan):
+    """Describe a plan from plan_batches as text for the confirm dialog and the console."""
+    lines = [
+        f"This operation will generate {plan['num_batches']} batches, each with up to {plan['records_per_batch']} records.",
+        "",
+        f"Records: {plan['total_records']}",
+        f"Disk space needed{' (at most)' if plan['allocated_is_upper_bound'] else ''}: "
+        f"{_format_bytes(plan['allocated_bytes'])} ({_format_bytes(plan['total_bytes'])} of data)",
+        f"Files and folders: {plan['inode_count']}",
+        f"Estimated time: {_format_duration(plan['estimated_seconds'])} "
+        f"(fetch {_format_duration(plan['fetch_seconds'])}, write {_format_duration(plan['write_seconds'])})",
+    ]
+
+    if plan['free_bytes'] is not None:
+        lines.append(f"Free space at target: {_format_bytes(plan['free_bytes'])}")
+    else:
+        lines.append("Free space at target: unknown")
+    if not plan['fits_on_disk']:
+        lines.append("")
+        lines.append("WARNING: There is not enough free space at the target for this job.")
+
+    return "\n".join(lines)